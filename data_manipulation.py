@@ -1,4 +1,5 @@
 """File for manipulating for data in datasets folder"""
+import functools
 import pandas as pd
 import geopandas as gp
 
@@ -91,6 +92,31 @@ def get_all_country_attributes() -> dict:
     return all_country_attributes
 
 
+@functools.lru_cache(maxsize=1)
+def get_world_map() -> gp.GeoDataFrame:
+    """Function that returns the naturalearth world map with country names matching the datasets.
+
+    The map is only read from disk once and then cached, so callers must not modify the returned GeoDataFrame.
+    """
+    world = gp.read_file(gp.datasets.get_path("naturalearth_lowres"))
+
+    # Reformatting certain country names
+    world["name"].replace("United States of America", "United States", inplace=True)
+    world["name"].replace("N. Cyprus", "North Cyprus", inplace=True)
+    world["name"].replace("Falkland Is.", "Falkland Islands", inplace=True)
+    world["name"].replace("Eq. Guinea", "Equitorial Guinea", inplace=True)
+    world["name"].replace("Dem. Rep. Congo", "Democratic Republic of Congo", inplace=True)
+    world["name"].replace("Central African Rep.", "Central African Republic", inplace=True)
+    world["name"].replace("Dominican Rep.", "Dominican Republic", inplace=True)
+    world["name"].replace("Soloman Is.", "Soloman Islands", inplace=True)
+    world["name"].replace("S. Sudan", "South Sudan", inplace=True)
+    world["name"].replace("Bosnia and Herz.", "Bosnia and Herzegovina", inplace=True)
+    world["name"].replace("Timor-Leste", "Timor", inplace=True)
+    world["name"].replace("Côte d'Ivoire", "Cote d'Ivoire", inplace=True)
+
+    return world
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Helper Methods
 # ----------------------------------------------------------------------------------------------------------------------
@@ -148,23 +174,7 @@ def _get_shipment_times(countries: dict) -> dict:
 
 def _get_countries_on_map() -> set:
     """Helper Method that returns a set of countries that are represented on the folium map"""
-    world = gp.read_file(gp.datasets.get_path("naturalearth_lowres"))
-
-    # Reformatting certain country names
-    world["name"].replace("United States of America", "United States", inplace=True)
-    world["name"].replace("N. Cyprus", "North Cyprus", inplace=True)
-    world["name"].replace("Falkland Is.", "Falkland Islands", inplace=True)
-    world["name"].replace("Eq. Guinea", "Equitorial Guinea", inplace=True)
-    world["name"].replace("Dem. Rep. Congo", "Democratic Republic of Congo", inplace=True)
-    world["name"].replace("Central African Rep.", "Central African Republic", inplace=True)
-    world["name"].replace("Dominican Rep.", "Dominican Republic", inplace=True)
-    world["name"].replace("Soloman Is.", "Soloman Islands", inplace=True)
-    world["name"].replace("S. Sudan", "South Sudan", inplace=True)
-    world["name"].replace("Bosnia and Herz.", "Bosnia and Herzegovina", inplace=True)
-    world["name"].replace("Timor-Leste", "Timor", inplace=True)
-    world["name"].replace("Côte d'Ivoire", "Cote d'Ivoire", inplace=True)
-
-    countries = world["name"].to_list()
+    countries = get_world_map()["name"].to_list()
     return set(countries)
 
 
@@ -181,7 +191,7 @@ def _get_avg_daily_vax_rate(df: pd.DataFrame, country: str) -> float:
 if __name__ == "__main__":
     import python_ta
     python_ta.check_all(config={
-        'extra-imports': ["pandas", "geopandas"],  # the names (strs) of imported modules
-        'allowed-io': ["_get_countries_on_map"],  # the names (strs) of functions that call print/open/input
+        'extra-imports': ["functools", "pandas", "geopandas"],  # the names (strs) of imported modules
+        'allowed-io': ["get_world_map"],  # the names (strs) of functions that call print/open/input
         'max-line-length': 120
     })
@@ -4,9 +4,12 @@ File that performs the genetic algorithm
 
 from dataclasses import dataclass
 import random
-from typing import Optional
+from typing import Callable, Optional
+import numpy as np
 import pandas
 import python_ta
+import operators as ops
+import selection as sel
 from world_graph import World, Country
 
 
@@ -64,12 +67,17 @@ class Gene:
             for shipment in lst_to_remove:
                 vaccine_shipments.remove(shipment)
             for exporter in exporters:
+                shipment_times = world.shipment_time_rows[world.exporter_index[exporter]]
                 for country, vaccine_amount in self.vaccine_distribution[exporter][i]:
-                    exporter_obj = world.exporting_countries[exporter]
-                    # adding shipment to stack
-                    vaccine_shipments.append(VaccineShipment(
-                        importing_country=world.countries[country], vaccine_amount=vaccine_amount,
-                        time_left=exporter_obj.edges[country].shipment_time))
+                    shipment_time = shipment_times[world.country_index[country]]
+                    if shipment_time <= 0:
+                        # shipment arrives without any delay, like the vaccines an exporter keeps for itself
+                        world.export_vaccine(importer=world.countries[country], vaccine_amount=vaccine_amount)
+                    else:
+                        # adding shipment to stack
+                        vaccine_shipments.append(VaccineShipment(
+                            importing_country=world.countries[country], vaccine_amount=vaccine_amount,
+                            time_left=shipment_time))
             for country in world.countries.values():
                 # country distributes vaccines to its population
                 country.vaccinate()
@@ -101,11 +109,14 @@ class Chromosome:
 
     Instance Attributes:
         - genes: a list of genes
+        - population: the array encoding of the genes, or None if it has not been computed
     """
     genes: list[Gene]
+    population: Optional[ops.Population]
 
-    def __init__(self, genes: list[Gene]) -> None:
+    def __init__(self, genes: list[Gene], population: Optional[ops.Population] = None) -> None:
         self.genes = genes
+        self.population = population
 
     def fitness(self, world: World, num_timestamps: int) -> None:
         """Runs simulation and gives a fitness score to the each of the genes in the chromosome"""
@@ -114,6 +125,10 @@ class Chromosome:
                 world=world, num_timestamps=num_timestamps, record_data=False)
             world.reset()
 
+    def fitness_array(self) -> np.ndarray:
+        """Returns the fitness values of the genes in the chromosome as an array"""
+        return np.fromiter((gene.fitness_value for gene in self.genes), dtype=np.int64, count=len(self.genes))
+
     def calculate_average_fitness(self) -> float:
         """Calculates the average fitness of the genes in the chromosome"""
         return sum([gene.fitness_value for gene in self.genes]) / len(self.genes)
@@ -128,19 +143,20 @@ class Chromosome:
         fitness_values = [gene.fitness_value for gene in self.genes]
         return min(fitness_values)
 
-    def update_final_distribution(self, world: World, dataframe: pandas.DataFrame) -> None:
-        """Updates the final distribution of the chromosome"""
+    def update_final_distribution(self, world: World, dataframe: pandas.DataFrame) -> pandas.DataFrame:
+        """Returns the dataframe with the final distribution of the chromosome appended to it"""
         lowest_gene = self.genes[0]
         for gene in self.genes:
             if gene.fitness_value < lowest_gene.fitness_value:
                 lowest_gene = gene
         lowest_gene.fitness(
             world=world, num_timestamps=lowest_gene.fitness_value, record_data=True)
+        rows = []
         for i in lowest_gene.country_data:
             timestamp = lowest_gene.country_data[i]
             for country in timestamp.keys():
-                dataframe.loc[len(dataframe)] = [
-                    i, country, timestamp[country]]
+                rows.append([i, country, timestamp[country]])
+        return pandas.concat([dataframe, pandas.DataFrame(rows, columns=dataframe.columns)], ignore_index=True)
 
     def __str__(self) -> str:
         string = ""
@@ -160,6 +176,13 @@ class GeneticAlgorithm:
         - gene_count: the number of genes in a chromosome
         - num_chromosomes: the number of chromosomes in a population
         - world: the world graph
+        - selection_strategy: the strategy used to select parents, one of selection.SELECTION_STRATEGIES
+        - tournament_size: the number of genes competing in each tournament of the tournament strategy
+        - rng: the random generator used by the selection strategies and the operators
+        - exporters: the names of the exporting countries in the order of the population encoding
+        - countries: the names of the countries in the order of the population encoding
+        - vaccine_budgets: the amount of vaccines each exporter ships at each timestamp
+        - repaired_genes: the number of offspring genes that had to be repaired in each generation
 
     """
     replication_rate: float
@@ -168,6 +191,13 @@ class GeneticAlgorithm:
     chromosome_size: int
     num_chromosomes: int
     num_best_genes: int
+    selection_strategy: str
+    tournament_size: int
+    rng: np.random.Generator
+    exporters: list[str]
+    countries: list[str]
+    vaccine_budgets: np.ndarray
+    repaired_genes: list[int]
     chromosome_dataframe: pandas.DataFrame
 
     world_graph: World
@@ -176,7 +206,11 @@ class GeneticAlgorithm:
     fitness_values: pandas.DataFrame
 
     def __init__(self, mutation_rate: float, crossover_rate: float, replication_rate: float, chromosome_size: int,
-                 num_chromosomes: int, world: World, num_timestamps: int, num_best_genes: int) -> None:
+                 num_chromosomes: int, world: World, num_timestamps: int, num_best_genes: int,
+                 selection_strategy: str = 'truncation', tournament_size: int = 3) -> None:
+        if selection_strategy not in sel.SELECTION_STRATEGIES:
+            raise ValueError(f"Unknown selection strategy {selection_strategy!r}, "
+                             f"expected one of {sel.SELECTION_STRATEGIES}")
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
         self.replication_rate = replication_rate
@@ -185,12 +219,26 @@ class GeneticAlgorithm:
         self.world_graph = world
         self.num_timestamps = num_timestamps
         self.num_best_genes = num_best_genes
+        self.selection_strategy = selection_strategy
+        self.tournament_size = tournament_size
+        self.rng = np.random.default_rng()
+        self.exporters = list(world.exporting_countries.keys())
+        self.countries = list(world.countries.keys())
+        timestamps_vaccine_amount = generate_timestamp_vaccine(num_timestamps=num_timestamps, world=world)
+        self.vaccine_budgets = np.array([timestamps_vaccine_amount[exporter] for exporter in self.exporters],
+                                        dtype=np.float64)
+        self.repaired_genes = []
         self.final_chromosome_data = pandas.DataFrame(
             columns=["Timestamp", "Country", "Percent Vaccinated"])
         self.fitness_values = pandas.DataFrame(columns=["Generation", "Fitness Value"])
 
-    def run(self) -> Chromosome:
-        """Runs the genetic algorithm and returns the final chromosome"""
+    def run(self, on_generation: Optional[Callable[[int, Chromosome], None]] = None,
+            verbose: bool = True) -> Chromosome:
+        """Runs the genetic algorithm and returns the final chromosome
+
+        If on_generation is given, it is called with the generation number and the chromosome after every generation.
+        If verbose is False, the fitness of each generation is not printed.
+        """
         chromosome = self.create_initial_chromosome()
         chromosome.fitness(
             num_timestamps=self.num_timestamps, world=self.world_graph)
@@ -198,12 +246,16 @@ class GeneticAlgorithm:
             chromosome = self.selection(chromosome=chromosome)
             chromosome.fitness(world=self.world_graph,
                                num_timestamps=self.num_timestamps)
-            print(f"Generation {i + 1} mean : {chromosome.calculate_average_fitness()} \
-            min: {chromosome.calculate_minimum_fitness()} \
-            max: {chromosome.calculate_maximum_fitness()}")
+            if verbose:
+                print(f"Generation {i + 1} mean : {chromosome.calculate_average_fitness()} \
+                min: {chromosome.calculate_minimum_fitness()} \
+                max: {chromosome.calculate_maximum_fitness()} \
+                repaired: {self.repaired_genes[-1]}")
             self.fitness_values.loc[i + 1] = [i + 1, chromosome.calculate_average_fitness()]
+            if on_generation is not None:
+                on_generation(i + 1, chromosome)
 
-        chromosome.update_final_distribution(
+        self.final_chromosome_data = chromosome.update_final_distribution(
             world=self.world_graph, dataframe=self.final_chromosome_data)
         return chromosome
 
@@ -247,111 +299,50 @@ class GeneticAlgorithm:
             genes.append(
                 Gene(vaccine_distribution=vaccine_distribution, fitness_value=None))
 
-        return Chromosome(genes)
-
-    def pick_best_genes(self, num_genes: int, genes: list[Gene]) -> list[Gene]:
-        """Returns the best genes from the list of genes"""
-        genes.sort(key=lambda x: x.fitness_value)
-        return genes[:num_genes]
-
-    def pick_random_option(self, remove_crossover: bool) -> str:
-        """Returns a random option from the options of replication, mutation, and crossover"""
-        # We don't want to do crossover if there are only 1 gene spot remaining
-        if remove_crossover:
-            weighted_randint = random.uniform(
-                0, self.replication_rate + self.mutation_rate)
-            if weighted_randint <= self.replication_rate:
-                return 'replication'
-            else:
-                return 'mutation'
-        weighted_randint = random.uniform(
-            0, self.replication_rate + self.mutation_rate + self.crossover_rate)
-        if weighted_randint <= self.replication_rate:
-            return 'replication'
-        elif weighted_randint <= self.replication_rate + self.mutation_rate:
-            return 'mutation'
+        population = ops.encode_distributions([gene.vaccine_distribution for gene in genes],
+                                              self.exporters, self.countries, self.num_timestamps)
+        return Chromosome(genes, population=population)
+
+    def select_parents(self, fitness_values: np.ndarray, num_parents: int) -> np.ndarray:
+        """Returns the indices of num_parents genes chosen by the selection strategy of the algorithm"""
+        if self.selection_strategy == 'tournament':
+            return sel.tournament_selection(fitness_values, num_parents, self.rng, self.tournament_size)
+        elif self.selection_strategy == 'rank':
+            return sel.rank_selection(fitness_values, num_parents, self.rng)
         else:
-            return 'crossover'
+            return sel.truncation_selection(fitness_values, num_parents, self.rng, self.num_best_genes)
+
+    def pick_options(self, num_options: int) -> np.ndarray:
+        """Returns num_options random options out of replication, mutation, and crossover weighted by their rates.
+        If all the rates are 0, every option is replication."""
+        rates = np.array([self.replication_rate, self.mutation_rate, self.crossover_rate])
+        if rates.sum() == 0:
+            return np.full(num_options, ops.REPLICATION)
+        return self.rng.choice([ops.REPLICATION, ops.MUTATION, ops.CROSSOVER], size=num_options,
+                               p=rates / rates.sum())
 
     def selection(self, chromosome: Chromosome) -> Chromosome:
-        """Select the best genes from the chromosome and perform crossover, mutation, and replication on the best genes
+        """Select parent genes from the chromosome and perform crossover, mutation, and replication on the parent genes
         and returns a chromosome including these genes"""
-
-        best_genes = self.pick_best_genes(
-            genes=chromosome.genes, num_genes=self.num_best_genes)
-        next_chromosome_genes = []
-
-        current_gene_index = 0
-
-        while len(next_chromosome_genes) != self.chromosome_size:
-            # randomly choosing which type of change to make
-            if len(next_chromosome_genes) == self.chromosome_size - 1:  # Removing crossover option
-                change_option = self.pick_random_option(remove_crossover=True)
-            else:
-                change_option = self.pick_random_option(remove_crossover=False)
-
-            if change_option == 'replication':
-                next_chromosome_genes.append(
-                    self.replication(best_genes[current_gene_index]))
-            elif change_option == 'mutation':
-                next_chromosome_genes.append(
-                    self.mutation(best_genes[current_gene_index]))
-            else:
-                # picking a random secondary gene to crossover with
-                crossover_index = random.randint(0, len(best_genes) - 2)
-                if crossover_index >= current_gene_index:
-                    crossover_index += 1
-                next_chromosome_genes.extend(self.crossover(
-                    best_genes[current_gene_index], best_genes[crossover_index]))
-            current_gene_index = (current_gene_index + 1) % len(best_genes)
-        return Chromosome(next_chromosome_genes)
-
-    def crossover(self, gene1: Gene, gene2: Gene) -> list[Gene]:
-        """Performs crossover on the two genes and returns a list of the two children genes aggressively"""
-        gene1_copy = Gene(vaccine_distribution=gene1.vaccine_distribution)
-        gene2_copy = Gene(vaccine_distribution=gene2.vaccine_distribution)
-        for exporter in gene1_copy.vaccine_distribution:
-            for i in range(len(gene1_copy.vaccine_distribution[exporter])):
-                occurrence_percentage = 0.45
-                crossover_probability = random.uniform(0, 1)
-                if crossover_probability > occurrence_percentage:
-                    gene1_copy.vaccine_distribution[exporter][i], gene2_copy.vaccine_distribution[exporter][
-                        i] = gene2_copy.vaccine_distribution[exporter][i], gene1_copy.vaccine_distribution[exporter][i]
-        return [gene1_copy, gene2_copy]
-
-    def mutation(self, gene: Gene) -> Gene:
-        """Performs mutation on the gene and returns the mutated gene aggressively"""
-        new_vaccine_distribution = {}
-        # traversing through the vaccine distribution of the gene
-        for exporter in gene.vaccine_distribution:
-            list_of_timestamps = []
-            for timestamp in gene.vaccine_distribution[exporter]:
-                # pass each timestamp to the mutation helper to mutate it
-                list_of_timestamps.append(
-                    self.mutation_helper(timestamp))
-                # reassign the mutated timestamp to the mutation helper
-                new_vaccine_distribution[exporter] = list_of_timestamps
-        return Gene(vaccine_distribution=new_vaccine_distribution)
-
-    def mutation_helper(self, timestamp: list[tuple]) -> list[tuple]:
-        """Helps the function in mutation """
-        timestamp_copy = timestamp.copy()
-        newest_timestamp = []
-        num = random.randint(0, len(timestamp))
-        while num != 0:
-            mutated_tuple = timestamp_copy.pop()
-            mutated_tuple = (mutated_tuple[0], random.randint(
-                int(mutated_tuple[1] * 0.8), int(mutated_tuple[1] * 1.2)))
-            newest_timestamp.append(mutated_tuple)
-            num -= 1
-        for tpl in timestamp_copy:
-            if tpl[0] not in [tup[0] for tup in newest_timestamp]:
-                newest_timestamp.append(tpl)
-        return newest_timestamp
-
-    def replication(self, gene: Gene) -> Gene:
-        """Returns the replicated gene"""
-        return Gene(vaccine_distribution=gene.vaccine_distribution)
+        population = chromosome.population
+        if population is None:
+            population = ops.encode_distributions([gene.vaccine_distribution for gene in chromosome.genes],
+                                                  self.exporters, self.countries, self.num_timestamps)
+
+        parent_indices = self.select_parents(chromosome.fitness_array(), self.chromosome_size)
+        # each parent is crossed over with the next selected parent
+        partner_indices = np.roll(parent_indices, -1)
+        options = self.pick_options(self.chromosome_size)
+        next_population = ops.breed_population(population, parent_indices, partner_indices, options, self.rng)
+        next_population, num_repaired = ops.repair_population(next_population, self.vaccine_budgets)
+        self.repaired_genes.append(num_repaired)
+        return self.create_chromosome(next_population)
+
+    def create_chromosome(self, population: ops.Population) -> Chromosome:
+        """Returns the chromosome of the genes encoded by the population"""
+        distributions = ops.decode_distributions(population, self.exporters, self.countries)
+        genes = [Gene(vaccine_distribution=distribution) for distribution in distributions]
+        return Chromosome(genes, population=population)
 
 
 def generate_timestamp_vaccine(num_timestamps: int, world: World) -> list[int]:
@@ -367,7 +358,8 @@ def generate_timestamp_vaccine(num_timestamps: int, world: World) -> list[int]:
 
 if __name__ == '__main__':
     python_ta.check_all(config={
-        'extra-imports': ['world_graph', 'pandas', 'typing', 'random', 'dataclasses'],
+        'extra-imports': ['world_graph', 'operators', 'selection', 'numpy', 'pandas', 'typing', 'random',
+                          'dataclasses'],
         'allowed-io': ['GeneticAlgorithm.run'],
         'max-line-length': 120
     })
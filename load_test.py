@@ -0,0 +1,71 @@
+"""Load test for the optimization service in service.py
+
+Submits many small jobs to a running service and reports the latency of the jobs and the throughput of the service.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import python_ta
+from service_client import DEFAULT_HOST, DEFAULT_PORT, submit_job
+
+
+async def timed_job(spec: dict, host: str, port: int) -> tuple[float, float]:
+    """Runs the job spec on the service and returns the time until its first generation and until it was done"""
+    start_time = time.perf_counter()
+    first_generation_time = None
+    async for message in submit_job(spec, host, port):
+        if message["type"] == "generation" and first_generation_time is None:
+            first_generation_time = time.perf_counter() - start_time
+        elif message["type"] == "error":
+            raise RuntimeError(message["message"])
+    total_time = time.perf_counter() - start_time
+    return (total_time if first_generation_time is None else first_generation_time), total_time
+
+
+async def run_load_test(spec: dict, num_jobs: int, concurrency: int, host: str, port: int) -> None:
+    """Submits num_jobs copies of the job spec with at most concurrency jobs in flight and prints the results"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_job() -> tuple[float, float]:
+        async with semaphore:
+            return await timed_job(spec, host, port)
+
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(limited_job() for _ in range(num_jobs)))
+    elapsed = time.perf_counter() - start_time
+
+    first_generation_times = sorted(result[0] for result in results)
+    latencies = sorted(result[1] for result in results)
+    print(f"{num_jobs} jobs, {concurrency} concurrent, {elapsed:.2f}s total")
+    print(f"throughput: {num_jobs / elapsed:.2f} jobs/s")
+    print(f"first generation: mean {statistics.mean(first_generation_times):.3f}s "
+          f"p50 {_percentile(first_generation_times, 50):.3f}s p95 {_percentile(first_generation_times, 95):.3f}s")
+    print(f"latency: mean {statistics.mean(latencies):.3f}s "
+          f"p50 {_percentile(latencies, 50):.3f}s p95 {_percentile(latencies, 95):.3f}s "
+          f"max {latencies[-1]:.3f}s")
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Returns the nearest rank percentile of the sorted values"""
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load tests the VaxOptima optimization service")
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--spec", default='{"num_timestamps": 100, "chromosome_size": 20, "num_chromosomes": 5}',
+                        help="the job spec as a JSON object")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    asyncio.run(run_load_test(json.loads(args.spec), args.jobs, args.concurrency, args.host, args.port))
+
+    python_ta.check_all(config={
+        'extra-imports': ['argparse', 'asyncio', 'json', 'statistics', 'time', 'service_client'],
+        'allowed-io': ['run_load_test'],
+        'max-line-length': 120
+    })
@@ -1,29 +1,62 @@
 """Main runner file"""
+import argparse
+from typing import Optional
 import python_ta
+import routing
 import world_graph as wg
 import genetic_algorithm as ga
 import visualization as vis
 
 
 def algorithm_runner(num_timestamps: int, num_best_genes: int, mutation_rate: float, crossover_rate: float,
-                     replication_rate: float, chromosome_size: int, num_chromosomes: int) -> None:
-    """Runs the algorithm"""
+                     replication_rate: float, chromosome_size: int, num_chromosomes: int, headless: bool = False,
+                     output_dir: str = "results", max_frames: Optional[int] = vis.DEFAULT_MAX_FRAMES,
+                     selection_strategy: str = 'truncation',
+                     shipment_links: Optional[list[tuple[str, str, int]]] = None) -> None:
+    """Runs the algorithm
+
+    If headless is True, the recorded data is written to output_dir instead of being visualized. It can be rendered
+    later with visualization.render_saved_data. Otherwise, the map animation is downsampled to max_frames frames.
+
+    If shipment_links are given as (source, destination, shipment time) tuples, shipments are routed through them
+    (and any hubs they name) whenever that is faster than shipping directly.
+    """
     world = wg.create_world()
+    if shipment_links is not None:
+        routing.route_world(world, shipment_links)
     simulation = ga.GeneticAlgorithm(mutation_rate=mutation_rate, crossover_rate=crossover_rate,
                                      replication_rate=replication_rate, chromosome_size=chromosome_size,
                                      num_chromosomes=num_chromosomes, world=world,
-                                     num_timestamps=num_timestamps, num_best_genes=num_best_genes)
+                                     num_timestamps=num_timestamps, num_best_genes=num_best_genes,
+                                     selection_strategy=selection_strategy)
     simulation.run()
-    vis.visualize_data(simulation.final_chromosome_data)
-    vis.visualize_fitness(simulation.fitness_values)
+    if headless:
+        vis.save_data(simulation.final_chromosome_data, simulation.fitness_values, output_dir)
+    else:
+        vis.visualize_data(simulation.final_chromosome_data, max_frames=max_frames)
+        vis.visualize_fitness(simulation.fitness_values)
 
 
 if __name__ == "__main__":
-    algorithm_runner(num_timestamps=500, num_best_genes=10, mutation_rate=0.5,
-                     crossover_rate=0.4, replication_rate=0.1, chromosome_size=100, num_chromosomes=100)
+    parser = argparse.ArgumentParser(description="Runs the VaxOptima genetic algorithm")
+    parser.add_argument("--headless", action="store_true",
+                        help="write the recorded data to --output-dir instead of visualizing it")
+    parser.add_argument("--output-dir", default="results")
+    parser.add_argument("--max-frames", type=int, default=vis.DEFAULT_MAX_FRAMES,
+                        help="the maximum number of frames of the map animation")
+    parser.add_argument("--render", action="store_true",
+                        help="visualize the data saved in --output-dir by a headless run instead of running")
+    args = parser.parse_args()
+
+    if args.render:
+        vis.render_saved_data(args.output_dir, max_frames=args.max_frames)
+    else:
+        algorithm_runner(num_timestamps=500, num_best_genes=10, mutation_rate=0.5,
+                         crossover_rate=0.4, replication_rate=0.1, chromosome_size=100, num_chromosomes=100,
+                         headless=args.headless, output_dir=args.output_dir, max_frames=args.max_frames)
 
     python_ta.check_all(config={
-        'extra-imports': ["genetic_algorithm", "visualization", "world_graph"],
+        'extra-imports': ["argparse", "typing", "genetic_algorithm", "routing", "visualization", "world_graph"],
         'allowed-io': [],
         'max-line-length': 120
     })
@@ -0,0 +1,142 @@
+"""
+File containing the population level operators of the genetic algorithm
+
+A population of genes is encoded as two arrays of shape (num_genes, num_exporters, num_timestamps, num_slots).
+country_indices holds the index of the importing country of each shipment and amounts holds its amount of vaccines.
+Every (gene, exporter, timestamp) slice holds up to num_slots shipments, and unused slots have an amount of 0.
+"""
+
+from dataclasses import dataclass
+import numpy as np
+import python_ta
+
+# Values of the options array given to breed_population
+REPLICATION = 0
+MUTATION = 1
+CROSSOVER = 2
+
+# Probability that a shipment of a mutated gene has its amount changed
+MUTATION_PROBABILITY = 0.5
+# Maximum relative change of the amount of a mutated shipment
+MUTATION_NOISE = 0.2
+# Probability that a timestamp of a crossed over gene is taken from the other parent
+CROSSOVER_SWAP_PROBABILITY = 0.55
+
+
+@dataclass
+class Population:
+    """The array encoding of a list of genes
+
+    Instance Attributes:
+        - country_indices: the index of the importing country of each shipment
+        - amounts: the amount of vaccines of each shipment
+
+    Representation Invariants:
+        - self.country_indices.shape == self.amounts.shape
+        - self.country_indices.ndim == 4
+    """
+    country_indices: np.ndarray
+    amounts: np.ndarray
+
+
+def encode_distributions(distributions: list[dict], exporters: list[str], countries: list[str],
+                         num_timestamps: int) -> Population:
+    """Returns the encoding of the vaccine distributions of a list of genes"""
+    country_index = {country: i for i, country in enumerate(countries)}
+    num_slots = max(len(timestamp) for distribution in distributions
+                    for exporter in exporters for timestamp in distribution[exporter])
+    shape = (len(distributions), len(exporters), num_timestamps, num_slots)
+    country_indices = np.zeros(shape, dtype=np.int64)
+    amounts = np.zeros(shape, dtype=np.float64)
+
+    for g, distribution in enumerate(distributions):
+        for e, exporter in enumerate(exporters):
+            for t, timestamp in enumerate(distribution[exporter]):
+                for s, (country, vaccine_amount) in enumerate(timestamp):
+                    country_indices[g, e, t, s] = country_index[country]
+                    amounts[g, e, t, s] = vaccine_amount
+
+    return Population(country_indices=country_indices, amounts=amounts)
+
+
+def decode_distributions(population: Population, exporters: list[str], countries: list[str]) -> list[dict]:
+    """Returns the vaccine distributions encoded by the population, leaving out the empty slots"""
+    distributions = []
+    for gene_countries, gene_amounts in zip(population.country_indices.tolist(), population.amounts.tolist()):
+        distribution = {}
+        for exporter, exporter_countries, exporter_amounts in zip(exporters, gene_countries, gene_amounts):
+            distribution[exporter] = [
+                [(countries[c], vaccine_amount) for c, vaccine_amount in zip(timestamp_countries, timestamp_amounts)
+                 if vaccine_amount > 0]
+                for timestamp_countries, timestamp_amounts in zip(exporter_countries, exporter_amounts)]
+        distributions.append(distribution)
+    return distributions
+
+
+def breed_population(population: Population, parent_indices: np.ndarray, partner_indices: np.ndarray,
+                     options: np.ndarray, rng: np.random.Generator) -> Population:
+    """Returns the offspring population, where offspring i is created from the gene parent_indices[i] using
+    options[i] (REPLICATION, MUTATION or CROSSOVER with the gene partner_indices[i]).
+
+    Crossover swaps whole timestamps with the partner and mutation changes the amounts of random shipments by up to
+    MUTATION_NOISE. The offspring amounts no longer match the vaccine budgets and must be passed to repair_population.
+
+    Preconditions:
+        - len(parent_indices) == len(partner_indices) == len(options)
+    """
+    country_indices = population.country_indices[parent_indices]
+    amounts = population.amounts[parent_indices].astype(np.float64)
+
+    # crossover: each timestamp is taken from the partner with CROSSOVER_SWAP_PROBABILITY
+    crossover_mask = options == CROSSOVER
+    swap_mask = rng.random(amounts.shape[:3]) < CROSSOVER_SWAP_PROBABILITY
+    swap_mask = (swap_mask & crossover_mask[:, np.newaxis, np.newaxis])[..., np.newaxis]
+    country_indices = np.where(swap_mask, population.country_indices[partner_indices], country_indices)
+    amounts = np.where(swap_mask, population.amounts[partner_indices], amounts)
+
+    # mutation: random shipments of the mutated genes are scaled by a factor between 0.8 and 1.2
+    mutated = np.flatnonzero(options == MUTATION)
+    mutated_shape = (len(mutated),) + amounts.shape[1:]
+    noise = rng.uniform(1 - MUTATION_NOISE, 1 + MUTATION_NOISE, size=mutated_shape)
+    noise_mask = rng.random(mutated_shape) < MUTATION_PROBABILITY
+    amounts[mutated] *= np.where(noise_mask, noise, 1.0)
+
+    return Population(country_indices=country_indices, amounts=amounts)
+
+
+def repair_population(population: Population, vaccine_budgets: np.ndarray) -> tuple[Population, int]:
+    """Returns the population with every gene made feasible, along with the number of genes that had to be repaired.
+
+    Negative amounts are set to 0 and every (gene, exporter, timestamp) slice is rescaled so that it ships exactly
+    the whole number of vaccines its exporter produced at that timestamp. The rescaled amounts are rounded down and
+    the vaccines lost to rounding are given to the shipments with the largest remainders, so the repaired amounts
+    are non-negative integers. Slices without any vaccines are left empty.
+
+    Preconditions:
+        - vaccine_budgets.shape == population.amounts.shape[1:3]
+        - all(budget >= 0 for budget in vaccine_budgets.flat)
+    """
+    original_amounts = population.amounts
+    amounts = np.clip(original_amounts, 0, None).astype(np.float64)
+    budgets = np.floor(vaccine_budgets)[np.newaxis, ..., np.newaxis]
+
+    totals = amounts.sum(axis=-1, keepdims=True)
+    scale = np.divide(budgets, totals, out=np.zeros_like(totals), where=totals > 0)
+    scaled_amounts = amounts * scale
+    rounded_amounts = np.floor(scaled_amounts)
+
+    # number of vaccines lost to rounding in each slice, given out one by one in order of the largest remainder
+    deficits = np.where(totals > 0, budgets - rounded_amounts.sum(axis=-1, keepdims=True), 0)
+    remainder_ranks = np.argsort(np.argsort(rounded_amounts - scaled_amounts, axis=-1), axis=-1)
+    repaired_amounts = (rounded_amounts + (remainder_ranks < deficits)).astype(np.int64)
+
+    num_repaired = int(np.count_nonzero(np.any(repaired_amounts != original_amounts, axis=(1, 2, 3))))
+    return Population(country_indices=population.country_indices, amounts=repaired_amounts), num_repaired
+
+
+if __name__ == '__main__':
+    python_ta.check_all(config={
+        'extra-imports': ['numpy', 'dataclasses'],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
@@ -0,0 +1,110 @@
+"""File for routing vaccine shipments through transshipment hubs"""
+import numpy as np
+import python_ta
+from world_graph import World
+
+
+class ShipmentRoutes:
+    """Shortest shipment times over the countries of a world and a directed, weighted shipment graph.
+    The shortest times are computed once with the Floyd-Warshall algorithm when the routes are created.
+
+    Only nodes with outgoing edges (the exporters, when direct shipments are included, and the sources of the links)
+    can be the start or an intermediate stop of a route, so the shortest times are only computed from those nodes
+    and only those nodes are used as intermediates.
+
+    Instance Attributes:
+        - nodes: the names of the nodes, which are the countries of the world followed by the hubs of the graph
+        - node_index: maps the name of a node to its column in shortest_times
+        - source_index: maps the name of a node that has outgoing edges or is an exporter to its row in shortest_times
+        - shortest_times: source x node matrix of the shortest shipment times, inf if there is no route
+
+    Representation Invariants:
+        - self.shortest_times.shape == (len(self.source_index), len(self.nodes))
+    """
+    nodes: list[str]
+    node_index: dict[str: int]
+    source_index: dict[str: int]
+    shortest_times: np.ndarray
+
+    def __init__(self, world: World, links: list[tuple[str, str, int]], include_direct: bool = True) -> None:
+        """Initializes the routes of the world with the given (source, destination, shipment time) links.
+        Nodes of the links that are not countries of the world are hubs. Raises a ValueError if a link has a
+        shipment time below 1, since only the shipments of an exporter to itself arrive without any delay.
+
+        If include_direct is True, the current shipment times of the world are also part of the graph, so a
+        shipment only goes through the links when that is faster. This includes the direct shipment times of every
+        exporter, so even without any links, a shipment can be rerouted through another exporter when that is faster.
+        """
+        for source, destination, shipment_time in links:
+            if shipment_time < 1:
+                raise ValueError(f"The link from {source} to {destination} has a shipment time of {shipment_time}, "
+                                 f"expected at least 1")
+
+        self.nodes = list(world.country_index)
+        self.node_index = dict(world.country_index)
+        for source, destination, _ in links:
+            for node in (source, destination):
+                if node not in self.node_index:
+                    self.node_index[node] = len(self.nodes)
+                    self.nodes.append(node)
+        self.source_index = {}
+        for source in list(world.exporter_index) + [source for source, _, _ in links]:
+            if source not in self.source_index:
+                self.source_index[source] = len(self.source_index)
+
+        source_nodes = [self.node_index[source] for source in self.source_index]
+        exporter_rows = [self.source_index[exporter] for exporter in world.exporter_index]
+        shortest_times = np.full((len(self.source_index), len(self.nodes)), np.inf)
+        if include_direct:
+            shortest_times[exporter_rows, :len(world.country_index)] = world.shipment_times
+        for source, destination, shipment_time in links:
+            i, j = self.source_index[source], self.node_index[destination]
+            shortest_times[i, j] = min(shortest_times[i, j], shipment_time)
+        shortest_times[np.arange(len(source_nodes)), source_nodes] = 0
+
+        for k, k_node in enumerate(source_nodes):
+            # shortest times of the routes that are allowed to stop at the first k + 1 sources
+            np.minimum(shortest_times, shortest_times[:, k_node, np.newaxis] + shortest_times[np.newaxis, k, :],
+                       out=shortest_times)
+        self.shortest_times = shortest_times
+
+    def shipment_time(self, source: str, destination: str) -> float:
+        """Returns the shortest shipment time from source to destination, or inf if there is no route
+
+        Preconditions:
+            - source in self.node_index and destination in self.node_index
+        """
+        if source not in self.source_index:
+            return 0 if source == destination else np.inf
+        return self.shortest_times[self.source_index[source], self.node_index[destination]]
+
+    def apply(self, world: World) -> None:
+        """Sets the shipment times of the world, including those of its edges, to the shortest shipment times from
+        its exporters to its countries. Raises a ValueError if an exporter has no route to a country.
+
+        Preconditions:
+            - world has the same countries and exporters as the world the routes were created with
+        """
+        exporter_rows = [self.source_index[exporter] for exporter in world.exporter_index]
+        shipment_times = self.shortest_times[exporter_rows, :len(world.country_index)]
+        num_unreachable = np.count_nonzero(np.isinf(shipment_times))
+        if num_unreachable > 0:
+            raise ValueError(f"{num_unreachable} exporter and country pairs have no shipment route")
+        world.set_shipment_times(shipment_times.astype(np.int64))
+
+
+def route_world(world: World, links: list[tuple[str, str, int]], include_direct: bool = True) -> ShipmentRoutes:
+    """Function that routes the shipments of the world through the given links and returns the computed routes.
+    See ShipmentRoutes for the meaning of the arguments.
+    """
+    routes = ShipmentRoutes(world, links, include_direct)
+    routes.apply(world)
+    return routes
+
+
+if __name__ == '__main__':
+    python_ta.check_all(config={
+        'extra-imports': ['numpy', 'world_graph'],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
@@ -0,0 +1,71 @@
+"""
+File containing the selection strategies used by the genetic algorithm
+
+Every strategy works on an array of fitness values, where a lower fitness value is better, and returns the indices
+of the selected genes. None of the strategies sort the whole population.
+"""
+
+import numpy as np
+import python_ta
+
+SELECTION_STRATEGIES = ('truncation', 'tournament', 'rank')
+
+
+def pick_best_indices(fitness_values: np.ndarray, num_best: int) -> np.ndarray:
+    """Returns the indices of the num_best lowest fitness values in no particular order using partial selection
+
+    Preconditions:
+        - num_best >= 1
+    """
+    if num_best >= len(fitness_values):
+        return np.arange(len(fitness_values))
+    return np.argpartition(fitness_values, num_best - 1)[:num_best]
+
+
+def truncation_selection(fitness_values: np.ndarray, num_selected: int, rng: np.random.Generator,
+                         num_best: int) -> np.ndarray:
+    """Returns num_selected indices drawn uniformly from the num_best best genes
+
+    Preconditions:
+        - num_best >= 1
+    """
+    best_indices = pick_best_indices(fitness_values, num_best)
+    return rng.choice(best_indices, size=num_selected)
+
+
+def tournament_selection(fitness_values: np.ndarray, num_selected: int, rng: np.random.Generator,
+                         tournament_size: int) -> np.ndarray:
+    """Returns num_selected indices, each being the winner of a tournament between tournament_size random genes
+
+    Preconditions:
+        - tournament_size >= 1
+    """
+    contestants = rng.integers(0, len(fitness_values), size=(num_selected, tournament_size))
+    winners = np.argmin(fitness_values[contestants], axis=1)
+    return contestants[np.arange(num_selected), winners]
+
+
+def rank_selection(fitness_values: np.ndarray, num_selected: int, rng: np.random.Generator) -> np.ndarray:
+    """Returns num_selected indices drawn with a probability that decreases linearly with the rank of the gene
+
+    Fitness values are timestamps, so the ranks are computed by counting the fitness values instead of sorting them.
+    Genes with equal fitness values share the same rank.
+
+    Preconditions:
+        - all(value >= 0 for value in fitness_values)
+    """
+    fitness_values = fitness_values.astype(np.int64)
+    counts = np.bincount(fitness_values)
+    # number of genes strictly better than each fitness value
+    num_better = np.cumsum(counts) - counts
+    ranks = num_better[fitness_values]
+    weights = len(fitness_values) - ranks
+    return rng.choice(len(fitness_values), size=num_selected, p=weights / weights.sum())
+
+
+if __name__ == '__main__':
+    python_ta.check_all(config={
+        'extra-imports': ['numpy'],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
@@ -0,0 +1,346 @@
+"""
+Long running optimization service
+
+The service builds the World once, hands a copy of it to a pool of warm worker processes and accepts genetic algorithm
+jobs over a local TCP socket. Messages are JSON objects, one per line. A client sends a job spec and the service
+replies with a "queued" message, one "generation" message per generation and finally a "done" or "error" message.
+Every reply carries the id of its job, so a client can submit several jobs over the same connection. A client may
+close its side of the connection once it has sent its job specs and still receives the messages of its jobs. If the
+service can no longer write to a client, the jobs of the client that are still queued or running are cancelled.
+
+Example job spec (every field is optional, see JobSpec for the defaults):
+    {"num_timestamps": 200, "chromosome_size": 50, "num_chromosomes": 20, "export_rates": {"India": 0.5}}
+"""
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+import functools
+import itertools
+import json
+import multiprocessing
+from multiprocessing.managers import SyncManager
+import signal
+import time
+from typing import Any, AsyncIterator, Optional
+import python_ta
+import genetic_algorithm as ga
+import synthetic_world as sw
+import world_graph as wg
+from service_client import DEFAULT_HOST, DEFAULT_PORT
+
+# State of a worker process, filled in by _init_worker
+_WORKER_STATE = {}
+
+
+class JobCancelled(Exception):
+    """Raised in a worker process when the client of the running job has disconnected"""
+
+
+@dataclass
+class JobSpec:
+    """The parameters of a genetic algorithm job
+
+    Instance Attributes:
+        - export_rates: maps an exporter to the export rate it uses in this job instead of its own
+    """
+    num_timestamps: int = 500
+    num_best_genes: int = 10
+    mutation_rate: float = 0.5
+    crossover_rate: float = 0.4
+    replication_rate: float = 0.1
+    chromosome_size: int = 100
+    num_chromosomes: int = 100
+    selection_strategy: str = 'truncation'
+    export_rates: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, spec: dict[str, Any]) -> 'JobSpec':
+        """Returns the job spec described by spec. Raises a ValueError if spec has unknown fields."""
+        known_fields = {spec_field.name for spec_field in fields(cls)}
+        unknown_fields = set(spec).difference(known_fields)
+        if unknown_fields:
+            raise ValueError(f"Unknown job spec fields {sorted(unknown_fields)}")
+        return cls(**spec)
+
+
+class OptimizationService:
+    """A service that runs genetic algorithm jobs on a warm pool of worker processes
+
+    Instance Attributes:
+        - world: the world every job runs on
+        - max_workers: the number of worker processes, and so the number of jobs that run at the same time
+    """
+    world: wg.World
+    max_workers: int
+    _executor: Optional[ProcessPoolExecutor]
+    _manager: Optional[SyncManager]
+    _events: Optional[Any]
+    _cancelled_jobs: Optional[Any]
+    _job_queues: dict[int, asyncio.Queue]
+    _job_ids: itertools.count
+    _dispatcher: Optional[asyncio.Task]
+    _clients: dict[asyncio.Task, tuple[asyncio.StreamReader, asyncio.StreamWriter]]
+
+    def __init__(self, world: wg.World, max_workers: int) -> None:
+        self.world = world
+        self.max_workers = max_workers
+        self._executor = None
+        self._manager = None
+        self._events = None
+        self._cancelled_jobs = None
+        self._job_queues = {}
+        self._job_ids = itertools.count(1)
+        self._dispatcher = None
+        self._clients = {}
+
+    async def start(self) -> None:
+        """Starts the worker processes and waits until each of them holds a copy of the world"""
+        loop = asyncio.get_running_loop()
+        # the helper processes ignore ctrl-c, so that only this process handles it and shuts them down
+        self._manager = SyncManager()
+        self._manager.start(_ignore_interrupts)
+        self._events = self._manager.Queue()
+        self._cancelled_jobs = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                             initargs=(self.world, self._events, self._cancelled_jobs))
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_up) for _ in range(self.max_workers)))
+        self._dispatcher = asyncio.create_task(self._dispatch_events())
+
+    async def stop(self) -> None:
+        """Cancels the unfinished jobs, stops the worker processes and closes the connections of the clients
+        once the last messages of their jobs are written
+        """
+        loop = asyncio.get_running_loop()
+        # running jobs stop at their next generation and queued jobs are dropped, instead of running to the end
+        for job_id in list(self._job_queues):
+            await loop.run_in_executor(None, self._cancelled_jobs.__setitem__, job_id, True)
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, cancel_futures=True))
+        self._events.put(None)
+        await self._dispatcher
+        # no more job specs are read, so every client handler returns once the messages of its jobs are written
+        for reader, writer in self._clients.values():
+            writer.transport.pause_reading()
+            reader.feed_eof()
+        await asyncio.gather(*self._clients)
+        self._manager.shutdown()
+
+    async def run_job(self, spec: JobSpec) -> AsyncIterator[dict]:
+        """Submits the job to the worker pool and yields its messages until it is done or has failed.
+        If the generator is closed before that, the job is cancelled.
+        """
+        job_id = next(self._job_ids)
+        self._job_queues[job_id] = asyncio.Queue()
+        yield {"type": "queued", "job_id": job_id}
+
+        future = self._executor.submit(_run_job, job_id, spec)
+        job = asyncio.wrap_future(future)
+        job.add_done_callback(lambda done: self._report_failure(done, job_id))
+        finished = False
+        try:
+            while not finished:
+                message = await self._job_queues[job_id].get()
+                finished = message["type"] in ("done", "error")
+                yield message
+        finally:
+            del self._job_queues[job_id]
+            # a job that has not started yet is cancelled directly, a running job stops at its next generation
+            if not finished and not future.cancel() and not future.done():
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._cancelled_jobs.__setitem__, job_id, True)
+                # the worker may have finished before it saw the flag, so the flag is removed once the job has stopped
+                await asyncio.wait([job])
+                await loop.run_in_executor(None, self._cancelled_jobs.pop, job_id, None)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Runs every job spec sent by the client and streams the messages of the jobs back.
+        The connection is closed once the client has stopped sending job specs and all of its jobs are over.
+        """
+        self._clients[asyncio.current_task()] = (reader, writer)
+        write_lock = asyncio.Lock()
+        jobs = []
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                jobs.append(asyncio.create_task(self._stream_job(line, writer, write_lock)))
+            # the end of the input only means that no more job specs follow, a job is cancelled once writing its
+            # messages to the client fails
+            await asyncio.gather(*jobs)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+        finally:
+            del self._clients[asyncio.current_task()]
+
+    async def _stream_job(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock) -> None:
+        """Runs the job spec on the given line and writes its messages to the client"""
+        try:
+            spec = JobSpec.from_dict(json.loads(line))
+        except (ValueError, TypeError) as error:
+            messages = _single_message({"type": "error", "job_id": None, "message": str(error)})
+        else:
+            messages = self.run_job(spec)
+        try:
+            async for message in messages:
+                async with write_lock:
+                    if writer.is_closing():
+                        raise ConnectionResetError("The client has disconnected")
+                    writer.write(json.dumps(message).encode() + b"\n")
+                    await writer.drain()
+        except ConnectionError:
+            # the client has disconnected, closing the messages below cancels the job
+            pass
+        finally:
+            await messages.aclose()
+
+    async def _dispatch_events(self) -> None:
+        """Moves the messages sent by the workers to the queue of their job"""
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await loop.run_in_executor(None, self._events.get)
+            if event is None:
+                return
+            job_id, message = event
+            if job_id in self._job_queues:
+                self._job_queues[job_id].put_nowait(message)
+
+    def _report_failure(self, future: asyncio.Future, job_id: int) -> None:
+        """Sends an error message for the job if it was dropped by the worker pool or its worker failed without
+        reporting the error itself. The message of a failed job goes through the event queue, so that it arrives
+        after the messages the worker already sent.
+        """
+        if future.cancelled():
+            # the job never started, so no messages of its worker can follow
+            if job_id in self._job_queues:
+                message = {"type": "error", "job_id": job_id, "message": "The service stopped before the job started"}
+                self._job_queues[job_id].put_nowait(message)
+        elif future.exception() is not None:
+            message = {"type": "error", "job_id": job_id, "message": repr(future.exception())}
+            asyncio.get_running_loop().run_in_executor(None, self._events.put, (job_id, message))
+
+
+async def serve(world: wg.World, host: str, port: int, max_workers: int) -> None:
+    """Runs the optimization service on host and port until it is cancelled"""
+    service = OptimizationService(world, max_workers)
+    await service.start()
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"Serving on {host}:{port} with {max_workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+async def _single_message(message: dict) -> AsyncIterator[dict]:
+    """Yields the given message"""
+    yield message
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Worker Methods
+# ----------------------------------------------------------------------------------------------------------------------
+def _ignore_interrupts() -> None:
+    """Makes the current process ignore ctrl-c"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _init_worker(world: wg.World, events: Any, cancelled_jobs: Any) -> None:
+    """Stores the world, the event queue and the ids of the cancelled jobs in the worker process"""
+    _ignore_interrupts()
+    _WORKER_STATE["world"] = world
+    _WORKER_STATE["events"] = events
+    _WORKER_STATE["cancelled_jobs"] = cancelled_jobs
+
+
+def _warm_up() -> None:
+    """Does nothing, so that submitting it starts a worker process"""
+
+
+def _run_job(job_id: int, spec: JobSpec) -> None:
+    """Runs the job on the world of the worker and sends a message for each generation and once it is done.
+    If the job fails or is cancelled, an error message is sent instead of the done message.
+    """
+    events = _WORKER_STATE["events"]
+    try:
+        message = _simulate_job(job_id, spec)
+    except Exception as error:  # the error is reported to the client instead
+        message = {"type": "error", "job_id": job_id, "message": repr(error)}
+    finally:
+        _WORKER_STATE["cancelled_jobs"].pop(job_id, None)
+    events.put((job_id, message))
+
+
+def _simulate_job(job_id: int, spec: JobSpec) -> dict:
+    """Runs the job on the world of the worker, sending a message for each generation, and returns the done message.
+    Raises JobCancelled if the job is cancelled while it runs.
+    """
+    world = _WORKER_STATE["world"]
+    events = _WORKER_STATE["events"]
+    cancelled_jobs = _WORKER_STATE["cancelled_jobs"]
+    start_time = time.perf_counter()
+
+    original_export_rates = {exporter: world.exporting_countries[exporter].export_rate
+                             for exporter in spec.export_rates}
+    for exporter, export_rate in spec.export_rates.items():
+        world.exporting_countries[exporter].export_rate = export_rate
+    world.reset()
+
+    def on_generation(generation: int, chromosome: ga.Chromosome) -> None:
+        if job_id in cancelled_jobs:
+            raise JobCancelled(f"Job {job_id} was cancelled")
+        events.put((job_id, {"type": "generation", "job_id": job_id, "generation": generation,
+                             "mean": chromosome.calculate_average_fitness(),
+                             "min": int(chromosome.calculate_minimum_fitness()),
+                             "max": int(chromosome.calculate_maximum_fitness())}))
+
+    try:
+        simulation = ga.GeneticAlgorithm(mutation_rate=spec.mutation_rate, crossover_rate=spec.crossover_rate,
+                                         replication_rate=spec.replication_rate,
+                                         chromosome_size=spec.chromosome_size,
+                                         num_chromosomes=spec.num_chromosomes, world=world,
+                                         num_timestamps=spec.num_timestamps, num_best_genes=spec.num_best_genes,
+                                         selection_strategy=spec.selection_strategy)
+        chromosome = simulation.run(on_generation=on_generation, verbose=False)
+    finally:
+        for exporter, export_rate in original_export_rates.items():
+            world.exporting_countries[exporter].export_rate = export_rate
+        world.reset()
+
+    return {"type": "done", "job_id": job_id, "best_fitness": int(chromosome.calculate_minimum_fitness()),
+            "elapsed": time.perf_counter() - start_time}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Runs the VaxOptima optimization service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--synthetic-importers", type=int, default=None,
+                        help="serve a synthetic world with this many importers instead of the real datasets")
+    parser.add_argument("--synthetic-exporters", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.synthetic_importers is None:
+        service_world = wg.create_world()
+    else:
+        service_world = sw.create_synthetic_world(args.synthetic_importers, args.synthetic_exporters, seed=0)
+    try:
+        asyncio.run(serve(service_world, args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+    python_ta.check_all(config={
+        'extra-imports': ['argparse', 'asyncio', 'concurrent.futures', 'dataclasses', 'functools', 'itertools', 'json',
+                          'multiprocessing', 'multiprocessing.managers', 'signal', 'time', 'typing',
+                          'genetic_algorithm', 'synthetic_world', 'world_graph', 'service_client'],
+        'allowed-io': ['serve'],
+        'max-line-length': 120
+    })
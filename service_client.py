@@ -0,0 +1,49 @@
+"""Client for the optimization service in service.py"""
+import argparse
+import asyncio
+import json
+from typing import AsyncIterator
+import python_ta
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+async def submit_job(spec: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> AsyncIterator[dict]:
+    """Sends the job spec to the service and yields the messages of the job until it is done or has failed"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(json.dumps(spec).encode() + b"\n")
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("The service closed the connection before the job was done")
+            message = json.loads(line)
+            yield message
+            if message["type"] in ("done", "error"):
+                return
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def print_job(spec: dict, host: str, port: int) -> None:
+    """Submits the job spec to the service and prints every message of the job"""
+    async for message in submit_job(spec, host, port):
+        print(json.dumps(message))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Submits a job to the VaxOptima optimization service")
+    parser.add_argument("spec", nargs="?", default="{}", help="the job spec as a JSON object")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    asyncio.run(print_job(json.loads(args.spec), args.host, args.port))
+
+    python_ta.check_all(config={
+        'extra-imports': ['argparse', 'asyncio', 'json', 'typing'],
+        'allowed-io': ['print_job'],
+        'max-line-length': 120
+    })
@@ -0,0 +1,92 @@
+"""File for generating synthetic worlds of arbitrary size, used to stress test the genetic algorithm"""
+from typing import Optional
+import numpy as np
+import python_ta
+from world_graph import World, Country, ExportingCountry, Edge
+
+# Shipment time distributions supported by generate_shipment_times:
+# uniform - every shipment time is drawn uniformly between 1 and max_shipment_time
+# poisson - shipment times are 1 plus a poisson variable with mean (max_shipment_time - 1) / 2, capped at the maximum
+# regional - countries are placed in regions; shipments within a region take 1 and the shipment time between
+#            regions grows with how far apart the regions are, like the continent table in data_manipulation
+SHIPMENT_TIME_DISTRIBUTIONS = ('uniform', 'poisson', 'regional')
+
+
+def create_synthetic_world(num_importers: int, num_exporters: int, shipment_time_distribution: str = 'uniform',
+                           max_shipment_time: int = 3, num_regions: int = 6, build_edges: bool = True,
+                           seed: Optional[int] = None) -> World:
+    """Function that creates a world with num_importers importing countries and num_exporters exporting countries
+
+    The exporters are also countries of the world, like in world_graph.create_world. If build_edges is False, the
+    exporters get no Edge objects and the shipment times only live in the world's dense shipment time matrix.
+
+    Preconditions:
+        - num_importers >= 1 and num_exporters >= 1
+        - shipment_time_distribution in SHIPMENT_TIME_DISTRIBUTIONS
+        - max_shipment_time >= 1
+        - num_regions >= 1
+    """
+    rng = np.random.default_rng(seed)
+    num_countries = num_importers + num_exporters
+    names = [f"Importer {i}" for i in range(num_importers)] + [f"Exporter {i}" for i in range(num_exporters)]
+    populations = rng.integers(100_000, 100_000_000, size=num_countries).tolist()
+    vaccine_rates = rng.uniform(0.001, 0.01, size=num_countries).tolist()
+    export_rates = rng.uniform(0.05, 1.0, size=num_exporters).tolist()
+
+    # the exporters are the last num_exporters countries, so their own column is num_importers + their index
+    shipment_times = generate_shipment_times(num_exporters, num_countries, shipment_time_distribution,
+                                             max_shipment_time, num_regions, rng)
+    shipment_times[np.arange(num_exporters), num_importers + np.arange(num_exporters)] = 0
+
+    countries: dict[str: Country] = {}
+    exporters: dict[str: ExportingCountry] = {}
+    for i in range(num_importers):
+        countries[names[i]] = Country(name=names[i], vaccine_rate=vaccine_rates[i], population=populations[i])
+    for j in range(num_exporters):
+        i = num_importers + j
+        exporter = ExportingCountry(name=names[i], vaccine_rate=vaccine_rates[i], export_rate=export_rates[j],
+                                    edges={}, population=populations[i])
+        exporters[names[i]] = exporter
+        countries[names[i]] = exporter
+
+    if build_edges:
+        for exporter, row in zip(exporters.values(), shipment_times.tolist()):
+            exporter.edges = {name: Edge(importer=countries[name], shipment_time=shipment_time)
+                              for name, shipment_time in zip(names, row)}
+
+    return World(countries, exporters, shipment_times=shipment_times)
+
+
+def generate_shipment_times(num_exporters: int, num_countries: int, distribution: str, max_shipment_time: int,
+                            num_regions: int, rng: np.random.Generator) -> np.ndarray:
+    """Function that returns an exporter x country matrix of shipment times drawn from the given distribution.
+    The exporters are assumed to be the last num_exporters countries.
+
+    Preconditions:
+        - num_exporters <= num_countries
+        - max_shipment_time >= 1
+        - num_regions >= 1
+    """
+    shape = (num_exporters, num_countries)
+    if distribution == 'uniform':
+        return rng.integers(1, max_shipment_time + 1, size=shape)
+    elif distribution == 'poisson':
+        return np.minimum(1 + rng.poisson((max_shipment_time - 1) / 2, size=shape), max_shipment_time)
+    elif distribution == 'regional':
+        regions = rng.integers(0, num_regions, size=num_countries)
+        exporter_regions = regions[num_countries - num_exporters:]
+        region_distance = np.abs(exporter_regions[:, np.newaxis] - regions[np.newaxis, :])
+        # regions at distance 0 ship in 1, the furthest regions ship in max_shipment_time
+        scaled_distance = region_distance * (max_shipment_time - 1) / max(num_regions - 1, 1)
+        return 1 + np.ceil(scaled_distance).astype(np.int64)
+    else:
+        raise ValueError(f"Unknown shipment time distribution {distribution!r}, "
+                         f"expected one of {SHIPMENT_TIME_DISTRIBUTIONS}")
+
+
+if __name__ == '__main__':
+    python_ta.check_all(config={
+        'extra-imports': ['typing', 'numpy', 'world_graph'],
+        'allowed-io': [],
+        'max-line-length': 120
+    })
@@ -2,34 +2,32 @@
 This module contains functions to visualize the data.
 """
 
+import functools
+import os
+from typing import Optional
 import pandas
 import plotly.express as px
-import geopandas
 import python_ta
+import data_manipulation as dm
 
+# File names used when the recorded data is written to disk instead of being visualized
+CHROMOSOME_DATA_FILE = "chromosome_data.csv"
+FITNESS_VALUES_FILE = "fitness_values.csv"
+# Maximum number of frames of the map animation, used both when visualizing directly and when rendering saved data
+DEFAULT_MAX_FRAMES = 100
 
-def visualize_data(dataframe: pandas.DataFrame) -> None:
+
+def visualize_data(dataframe: pandas.DataFrame, max_frames: Optional[int] = DEFAULT_MAX_FRAMES) -> None:
     """
     Visualize the dataframe on a map across timestamps using plotly and geopandas.
+
+    The timestamps are downsampled so that the animation has at most max_frames frames, or all of them are shown
+    if max_frames is None.
     """
-    # Load a GeoDataFrame with world geometry data
-    world = geopandas.read_file(geopandas.datasets.get_path("naturalearth_lowres"))
-    # Rename the columns to match the dataframe
-    world["name"].replace("United States of America", "United States", inplace=True)
-    world["name"].replace("N. Cyprus", "North Cyprus", inplace=True)
-    world["name"].replace("Falkland Is.", "Falkland Islands", inplace=True)
-    world["name"].replace("Eq. Guinea", "Equitorial Guinea", inplace=True)
-    world["name"].replace("Dem. Rep. Congo", "Democratic Republic of Congo", inplace=True)
-    world["name"].replace("Central African Rep.", "Central African Republic", inplace=True)
-    world["name"].replace("Dominican Rep.", "Dominican Republic", inplace=True)
-    world["name"].replace("Soloman Is.", "Soloman Islands", inplace=True)
-    world["name"].replace("S. Sudan", "South Sudan", inplace=True)
-    world["name"].replace("Bosnia and Herz.", "Bosnia and Herzegovina", inplace=True)
-    world["name"].replace("Timor-Leste", "Timor", inplace=True)
-    world["name"].replace("Côte d'Ivoire", "Cote d'Ivoire", inplace=True)
-
-    # Merge your data with the GeoDataFrame
-    world_data = world.merge(dataframe, left_on="name", right_on="Country")
+    dataframe = downsample_timestamps(dataframe, max_frames)
+
+    # Merge your data with the cached country table
+    world_data = _get_country_codes().merge(dataframe, left_on="name", right_on="Country")
 
     # Create a custom color scale from red to green
     custom_color_scale = [
@@ -63,9 +61,57 @@ def visualize_fitness(fitness_values: pandas.DataFrame) -> None:
     line_graph.show()
 
 
+def downsample_timestamps(dataframe: pandas.DataFrame, max_frames: Optional[int]) -> pandas.DataFrame:
+    """
+    Returns the rows of the dataframe belonging to at most max_frames evenly spaced timestamps.
+    The last timestamp is always kept. If max_frames is None, the dataframe is returned unchanged.
+
+    Preconditions:
+        - max_frames is None or max_frames >= 1
+    """
+    timestamps = sorted(dataframe["Timestamp"].unique())
+    if max_frames is None or len(timestamps) <= max_frames:
+        return dataframe
+    if max_frames == 1:
+        kept_timestamps = [timestamps[-1]]
+    else:
+        step = (len(timestamps) - 1) / (max_frames - 1)
+        kept_timestamps = [timestamps[round(i * step)] for i in range(max_frames)]
+    return dataframe[dataframe["Timestamp"].isin(kept_timestamps)]
+
+
+def save_data(chromosome_data: pandas.DataFrame, fitness_values: pandas.DataFrame, output_dir: str) -> None:
+    """
+    Writes the recorded chromosome data and fitness values to output_dir so they can be rendered later.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    chromosome_data.to_csv(os.path.join(output_dir, CHROMOSOME_DATA_FILE), index=False)
+    fitness_values.to_csv(os.path.join(output_dir, FITNESS_VALUES_FILE), index=False)
+
+
+def render_saved_data(output_dir: str, max_frames: Optional[int] = DEFAULT_MAX_FRAMES) -> None:
+    """
+    Visualizes data previously written by save_data, downsampling the map animation to at most max_frames frames.
+    """
+    chromosome_data = pandas.read_csv(os.path.join(output_dir, CHROMOSOME_DATA_FILE))
+    fitness_values = pandas.read_csv(os.path.join(output_dir, FITNESS_VALUES_FILE))
+    visualize_data(chromosome_data, max_frames=max_frames)
+    visualize_fitness(fitness_values)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_country_codes() -> pandas.DataFrame:
+    """
+    Helper function that returns the country names and iso codes of the world map. Plotly draws the geometry
+    from the iso codes, so only these two columns are kept and the table is built once and cached.
+    """
+    world = dm.get_world_map()
+    return pandas.DataFrame(world[["name", "iso_a3"]])
+
+
 if __name__ == '__main__':
     python_ta.check_all(config={
-        'extra-imports': ["pandas", "plotly.express", "geopandas"],
-        'allowed-io': [],
+        'extra-imports': ["functools", "os", "typing", "pandas", "plotly.express", "data_manipulation"],
+        'allowed-io': ["render_saved_data"],
         'max-line-length': 120
     })
@@ -1,4 +1,6 @@
 """File for the representation of the world graph"""
+from typing import Optional
+import numpy as np
 import data_manipulation as dm
 
 
@@ -65,13 +67,69 @@ class ExportingCountry(Country):
 
 
 class World:
-    """A class representing the world. Equivalent to Graph."""
+    """A class representing the world. Equivalent to Graph.
+
+    Instance Attributes:
+    - exporter_index:
+        maps the name of an exporter to its row in shipment_times
+    - country_index:
+        maps the name of a country to its column in shipment_times
+    - shipment_times:
+        dense exporter x country matrix of shipment times. This is what the simulation reads, and the shipment times
+        of the exporters' edges are kept equal to it
+    - shipment_time_rows:
+        shipment_times as nested lists, for fast lookups of single shipment times
+    """
     exporting_countries: dict[str: ExportingCountry]
     countries: dict[str: Country]
+    exporter_index: dict[str: int]
+    country_index: dict[str: int]
+    shipment_times: np.ndarray
+    shipment_time_rows: list[list[int]]
 
-    def __init__(self, countries: dict, exporting_countries: dict) -> None:
+    def __init__(self, countries: dict, exporting_countries: dict, shipment_times: Optional[np.ndarray] = None) -> None:
+        """Initializes the world. If shipment_times is None, it is built from the edges of the exporters."""
         self.countries = countries
         self.exporting_countries = exporting_countries
+        self.exporter_index = {exporter: i for i, exporter in enumerate(exporting_countries)}
+        self.country_index = {country: i for i, country in enumerate(countries)}
+        if shipment_times is None:
+            shipment_times = self.shipment_times_from_edges()
+        self.set_shipment_times(shipment_times)
+
+    def shipment_times_from_edges(self) -> np.ndarray:
+        """Returns the exporter x country matrix of the shipment times of the exporters' edges.
+        Raises a ValueError if an exporter has no edge to a country other than itself.
+        """
+        shipment_times = np.full((len(self.exporting_countries), len(self.countries)), -1, dtype=np.int64)
+        for exporter in self.exporting_countries.values():
+            row = self.exporter_index[exporter.name]
+            # an exporter ships to itself without any delay, Gene.fitness delivers these shipments right away
+            shipment_times[row, self.country_index[exporter.name]] = 0
+            for country, edge in exporter.edges.items():
+                shipment_times[row, self.country_index[country]] = edge.shipment_time
+
+        num_missing = np.count_nonzero(shipment_times == -1)
+        if num_missing > 0:
+            raise ValueError(f"{num_missing} exporter and country pairs have no edge")
+        return shipment_times
+
+    def set_shipment_times(self, shipment_times: np.ndarray) -> None:
+        """Sets the exporter x country matrix of shipment times used by the simulation and updates the shipment times
+        of the exporters' edges to match it"""
+        expected_shape = (len(self.exporting_countries), len(self.countries))
+        if shipment_times.shape != expected_shape:
+            raise ValueError(f"Expected a shipment time matrix of shape {expected_shape}, got {shipment_times.shape}")
+        self.shipment_times = shipment_times
+        self.shipment_time_rows = shipment_times.tolist()
+        for exporter in self.exporting_countries.values():
+            row = self.shipment_time_rows[self.exporter_index[exporter.name]]
+            for country, edge in exporter.edges.items():
+                edge.shipment_time = row[self.country_index[country]]
+
+    def shipment_time(self, exporter: str, country: str) -> int:
+        """Returns the time it takes to ship vaccines from the exporter to the country"""
+        return self.shipment_time_rows[self.exporter_index[exporter]][self.country_index[country]]
 
     def reset(self) -> None:
         """Resets the world to the initial state"""
@@ -156,7 +214,7 @@ def get_edges(exporter: str, countries: dict, continents: dict, shipment_times:
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
-        'extra-imports': ["data_manipulation"],
+        'extra-imports': ["typing", "numpy", "data_manipulation"],
         'allowed-io': [],
         'max-line-length': 120
     })